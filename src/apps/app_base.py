@@ -2,8 +2,8 @@ from __future__ import annotations
 
 import os
 import io
-from urllib.parse import urljoin, urlsplit
-from dataclasses import dataclass
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+from dataclasses import dataclass, field
 import aiohttp
 import discord
 from abc import ABC, abstractmethod
@@ -15,6 +15,17 @@ class ResolvedMedia:
 	is_video: bool | None = None
 
 
+@dataclass
+class Delivery:
+	resolved: int = 0
+	messages: list[discord.Message] = field(default_factory=list)
+
+	@property
+	def complete(self) -> bool:
+		"""True when every resolved media item was uploaded."""
+		return self.resolved > 0 and len(self.messages) == self.resolved
+
+
 def _has_heic_filename(filename: str) -> bool:
 	return os.path.splitext(filename)[1].lower() in (".heic", ".heif")
 
@@ -65,6 +76,8 @@ class AppBase(ABC):
 
 	candidate_urls: list[str] = []
 	MAX_DISCORD_FILE_SIZE = 8 * 1024 * 1024  # 8 MB
+	# Share/tracking query params that don't change which post a link points to.
+	TRACKING_PARAMS: set[str] = set()
 
 	@abstractmethod
 	def match(self, message_content: str) -> str | None:
@@ -81,6 +94,18 @@ class AppBase(ABC):
 		"""Check if the URL belongs to this app."""
 		pass
 
+	def canonical_link(self, url: str) -> str:
+		"""Normalize a link so repeated shares of the same post compare equal."""
+		parsed = urlsplit(url.strip())
+		netloc = parsed.netloc.lower()
+		if netloc.startswith("www."):
+			netloc = netloc[4:]
+		path = parsed.path.rstrip("/") or "/"
+		query = urlencode(sorted(
+			(key, value) for key, value in parse_qsl(parsed.query) if key.lower() not in self.TRACKING_PARAMS
+		))
+		return urlunsplit(("https", netloc, path, query, ""))
+
 	def _add_candidate(self, url: str, base_url: str) -> None:
 		if not url:
 			return
@@ -94,57 +119,62 @@ class AppBase(ABC):
 		if url not in self.candidate_urls:
 			self.candidate_urls.append(url)
 
-	async def handle_message(self, message: discord.Message, url: str):
-		"""Fetch, resolve, and deliver media."""
+	async def handle_message(self, message: discord.Message, url: str) -> Delivery:
+		"""Fetch, resolve, and deliver media. Reports how many items resolved and which messages carry them."""
 		try:
 			media_items = await self.resolve(url)
 		except Exception as exc:
 			await message.channel.send(f"Error processing the link: {exc}")
-			return
+			return Delivery()
 
 		if not media_items:
 			await message.channel.send("Could not find media in the link.")
-			return
+			return Delivery()
 
 		if isinstance(media_items, str):
-			await self.deliver_media(message, media_items, self.headers)
-		else:
-			for item in media_items:
-				await self.deliver_media(
-					message,
-					item.url if hasattr(item, "url") else item,
-					self.headers,
-					getattr(item, "is_video", None),
-				)
-
-	async def deliver_media(self, message: discord.Message, media_url: str, headers: dict[str, str], is_video: bool | None = None) -> None:
+			media_items = [media_items]
+		delivery = Delivery(resolved=len(media_items))
+		for item in media_items:
+			delivered = await self.deliver_media(
+				message,
+				item.url if hasattr(item, "url") else item,
+				self.headers,
+				getattr(item, "is_video", None),
+			)
+			if delivered:
+				delivery.messages.append(delivered)
+		return delivery
+
+	async def deliver_media(self, message: discord.Message, media_url: str, headers: dict[str, str], is_video: bool | None = None) -> discord.Message | None:
+		"""Upload a single media file. Returns the sent message, or None if no file was uploaded."""
 		try:
 			async with aiohttp.ClientSession(headers=headers) as session:
 				async with session.get(media_url) as media_response:
 					if media_response.status != 200:
 						await message.channel.send("Failed to download media.")
-						return
+						return None
 
 					size_header = media_response.headers.get("Content-Length")
 					if size_header and int(size_header) > self.MAX_DISCORD_FILE_SIZE:
 						await message.channel.send(f"[slop]({media_url})")
-						return
+						return None
 
 					media_bytes = await media_response.read()
 					content_type = media_response.headers.get("Content-Type", "")
 
 			if len(media_bytes) > self.MAX_DISCORD_FILE_SIZE:
 				await message.channel.send(f"[slop]({media_url})")
-				return
+				return None
 
 			filename = self.filename_from_url(media_url, is_video)
 
 			if not is_video and (_is_real_heic(media_bytes, content_type) or _has_heic_filename(filename)):
 				media_bytes, filename = _fix_heic_media(media_bytes, filename, content_type)
 
-			await message.channel.send(file=discord.File(io.BytesIO(media_bytes), filename=filename))
+			return await message.channel.send(file=discord.File(io.BytesIO(media_bytes), filename=filename))
 		except Exception as exc:
 			await message.channel.send(f"Failed to deliver media: {exc}")
+			return None
 
 	def filename_from_url(self, url: str, is_video: bool | None = None) -> str:
 		path = urlsplit(url).path
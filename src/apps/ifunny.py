@@ -29,7 +29,7 @@ class IFunnyApp(AppBase):
 		return parsed_url.netloc.lower().endswith("ifunny.co")
 
 	async def resolve(self, url: str):
-		if not self.is_ifunny_link(url):
+		if not self.is_link(url):
 			return "⚠️ Invalid link source. Only ifunny.co links are allowed."
 
 		try:
@@ -1,11 +1,11 @@
 from __future__ import annotations
 
 import aiohttp
-import json
 import re
 from urllib.parse import parse_qs, urlparse, urlunparse
 from bs4 import BeautifulSoup
 from yarl import URL
+from utils.fast_runtime import json_dumps, json_loads
 from .app_base import AppBase, ResolvedMedia
 
 INSTAGRAM_HEADERS = {
@@ -33,6 +33,8 @@ class InstagramApp(AppBase):
 		re.compile(r'"lsd",\[\],{"token":"([^"]+)'),
 	]
 	URL_REGEX = re.compile(r"https?://\S+")
+	POST_TYPES = {"p", "reel", "reels", "tv"}
+	TRACKING_PARAMS = {"igsh", "igshid", "utm_source", "utm_medium", "utm_campaign"}
 
 	def match(self, message_content: str) -> str | None:
 		for match in self.URL_REGEX.finditer(message_content):
@@ -47,6 +49,19 @@ class InstagramApp(AppBase):
 		domain = parsed_url.netloc.lower()
 		return domain.endswith("instagram.com") or domain.endswith("instagr.am")
 
+	def canonical_link(self, url: str) -> str:
+		# Key on the shortcode so /p/, /reel/ and instagr.am links share an entry.
+		# img_index selects a single carousel item, so it stays part of the key.
+		parsed = urlparse(url)
+		segments = [segment for segment in parsed.path.split("/") if segment]
+		for idx, segment in enumerate(segments[:-1]):
+			if segment in self.POST_TYPES:
+				key = f"instagram:{segments[idx + 1]}"
+				query_params = parse_qs(parsed.query)
+				index_values = query_params.get("img_index") or query_params.get("img_index[]")
+				return f"{key}?img_index={index_values[0]}" if index_values else key
+		return super().canonical_link(url)
+
 	async def resolve(self, url: str):
 		if not self.is_link(url):
 			raise ValueError("⚠️ Invalid link source. Only instagram.com links are allowed.")
@@ -157,7 +172,7 @@ class InstagramApp(AppBase):
 
 		params = {
 			"doc_id": self.INSTAGRAM_GRAPHQL_DOC_ID,
-			"variables": json.dumps(variables, separators=(",", ":")),
+			"variables": json_dumps(variables),
 		}
 
 		try:
@@ -166,7 +181,7 @@ class InstagramApp(AppBase):
 			) as response:
 				if response.status != 200:
 					raise RuntimeError(f"Instagram GraphQL returned HTTP {response.status}")
-				payload = await response.json(content_type=None)
+				payload = await response.json(content_type=None, loads=json_loads)
 		except aiohttp.ClientError as exc:
 			raise RuntimeError(f"GraphQL request failed: {exc}") from exc
 
@@ -4,6 +4,7 @@ import aiohttp
 import re
 from urllib.parse import urlparse, quote
 
+from utils.fast_runtime import json_loads
 from .app_base import AppBase, ResolvedMedia
 
 TIKTOK_HEADERS = {
@@ -22,6 +23,7 @@ class TikTokApp(AppBase):
 
 	URL_REGEX = re.compile(r"https?://\S+")
 	TIKTOK_DOMAINS = {"tiktok.com", "www.tiktok.com", "vm.tiktok.com", "m.tiktok.com"}
+	TRACKING_PARAMS = {"is_from_webapp", "sender_device", "web_id", "_r", "_t"}
 
 	def match(self, message_content: str) -> str | None:
 		for m in self.URL_REGEX.finditer(message_content):
@@ -34,6 +36,19 @@ class TikTokApp(AppBase):
 		domain = urlparse(url).netloc.lower()
 		return any(domain == d or domain.endswith("." + d) for d in self.TIKTOK_DOMAINS)
 
+	def canonical_link(self, url: str) -> str:
+		# Key on the post id; short links (vm.tiktok.com/<code>, /t/<code>) can only key on their code.
+		parsed = urlparse(url)
+		segments = [segment for segment in parsed.path.split("/") if segment]
+		for idx, segment in enumerate(segments[:-1]):
+			if segment in ("video", "photo") and segments[idx + 1].isdigit():
+				return f"tiktok:{segments[idx + 1]}"
+		if parsed.netloc.lower().startswith("vm.") and segments:
+			return f"tiktok:short:{segments[0]}"
+		if len(segments) == 2 and segments[0] == "t":
+			return f"tiktok:short:{segments[1]}"
+		return super().canonical_link(url)
+
 	async def resolve(self, url: str):
 		if not self.is_link(url):
 			raise ValueError("Invalid link source. Only tiktok.com links are allowed.")
@@ -45,7 +60,7 @@ class TikTokApp(AppBase):
 				async with session.get(api_url, headers=TIKTOK_HEADERS) as response:
 					if response.status != 200:
 						raise RuntimeError(f"TikTok API returned HTTP {response.status}")
-					data = await response.json(content_type=None)
+					data = await response.json(content_type=None, loads=json_loads)
 
 			if data.get("code") != 0:
 				raise RuntimeError(data.get("msg", "Unknown API error"))
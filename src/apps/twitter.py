@@ -4,6 +4,7 @@ import aiohttp
 import re
 from urllib.parse import urlparse
 
+from utils.fast_runtime import json_loads
 from .app_base import AppBase, ResolvedMedia
 
 TWITTER_HEADERS = {
@@ -23,6 +24,7 @@ class TwitterApp(AppBase):
 	URL_REGEX = re.compile(r"https?://\S+")
 	TWITTER_DOMAINS = {"twitter.com", "www.twitter.com", "x.com", "www.x.com"}
 	SHORTLINK_DOMAINS = {"t.co", "www.t.co"}
+	TRACKING_PARAMS = {"s", "t", "ref_src", "ref_url"}
 
 	def match(self, message_content: str) -> str | None:
 		for m in self.URL_REGEX.finditer(message_content):
@@ -35,6 +37,15 @@ class TwitterApp(AppBase):
 		domain = urlparse(url).netloc.lower()
 		return domain in self.TWITTER_DOMAINS or domain in self.SHORTLINK_DOMAINS
 
+	def canonical_link(self, url: str) -> str:
+		# Key on the status id so twitter.com/x.com and any handle in the path share an entry.
+		segments = [segment for segment in urlparse(url).path.split("/") if segment]
+		if "status" in segments:
+			idx = segments.index("status")
+			if idx + 1 < len(segments) and segments[idx + 1].isdigit():
+				return f"twitter:{segments[idx + 1]}"
+		return super().canonical_link(url)
+
 	async def resolve(self, url: str):
 		if not self.is_link(url):
 			raise ValueError("Invalid link source. Only twitter.com/x.com links are allowed.")
@@ -57,7 +68,7 @@ class TwitterApp(AppBase):
 				async with session.get(api_url) as response:
 					if response.status != 200:
 						raise RuntimeError(f"fxtwitter API returned HTTP {response.status}")
-					data = await response.json(content_type=None)
+					data = await response.json(content_type=None, loads=json_loads)
 
 			tweet = data.get("tweet")
 			if not tweet:
@@ -1,13 +1,24 @@
+import asyncio
 import discord
 from apps.ifunny import IFunnyApp
 from apps.instagram import InstagramApp
 from apps.twitter import TwitterApp
 from apps.tiktok import TikTokApp
+from utils.upload_cache import UploadCache
+
+DEDUP_MODES = ("off", "jump", "resend")
+MAX_MESSAGE_LENGTH = 2000
 
 class MyClient(discord.Client):
-    def __init__(self, intents):
+    def __init__(self, intents, dedup_mode: str = "jump", dedup_ttl: float = 3600):
         super().__init__(intents=intents)
         self.apps = [IFunnyApp(), InstagramApp(), TwitterApp(), TikTokApp()]
+        if dedup_mode not in DEDUP_MODES:
+            raise ValueError(f"dedup_mode must be one of {DEDUP_MODES}")
+        self.dedup_mode = dedup_mode
+        self.upload_cache = UploadCache(ttl=dedup_ttl)
+        # (guild_id, canonical link) -> set once the upload in progress finishes
+        self._pending_uploads: dict[tuple[int, str], asyncio.Event] = {}
 
     async def on_ready(self):
         print(f"{self.user} online")
@@ -19,5 +30,80 @@ class MyClient(discord.Client):
         for app in self.apps:
             url = app.match(message.content)
             if url:
-                await app.handle_message(message, url)
-                break
\ No newline at end of file
+                await self._dispatch(app, message, url)
+                break
+
+    async def on_raw_message_delete(self, payload):
+        self.upload_cache.forget_messages((payload.message_id,))
+
+    async def on_raw_bulk_message_delete(self, payload):
+        self.upload_cache.forget_messages(payload.message_ids)
+
+    async def _dispatch(self, app, message, url):
+        # Dedup is per guild; DMs always get a fresh upload.
+        guild_id = message.guild.id if message.guild else None
+        if self.dedup_mode == "off" or guild_id is None:
+            await app.handle_message(message, url)
+            return
+
+        key = (guild_id, app.canonical_link(url))
+        # Reposts that arrive while the same link is still uploading wait for it
+        # instead of downloading again.
+        while key in self._pending_uploads:
+            await self._pending_uploads[key].wait()
+
+        cached = self.upload_cache.get(*key)
+        if cached and self._can_reuse(message, cached):
+            await self._send_cached(message, cached)
+            return
+        if self.upload_cache.failed_recently(*key):
+            await message.channel.send("Couldn't fetch media for that link just now, try again in a bit.")
+            return
+
+        done = asyncio.Event()
+        self._pending_uploads[key] = done
+        try:
+            delivery = await app.handle_message(message, url)
+            # A partial carousel would make every repost link to an incomplete set.
+            if delivery.complete:
+                self.upload_cache.store(*key, delivery.messages)
+            else:
+                self.upload_cache.mark_failed(*key)
+        finally:
+            del self._pending_uploads[key]
+            done.set()
+
+    def _can_reuse(self, message, cached) -> bool:
+        # Only point at (or copy from) an upload the poster can see themselves.
+        if cached.channel_id == message.channel.id:
+            return True
+        original = message.guild.get_channel_or_thread(cached.channel_id)
+        if original is None or not isinstance(message.author, discord.Member):
+            return False
+        permissions = original.permissions_for(message.author)
+        return permissions.view_channel and permissions.read_message_history
+
+    async def _send_cached(self, message, cached):
+        if self.dedup_mode == "resend" and cached.attachment_urls:
+            try:
+                for chunk in _chunk_lines(cached.attachment_urls, MAX_MESSAGE_LENGTH):
+                    await message.channel.send(chunk)
+                return
+            except discord.HTTPException:
+                pass
+        await message.channel.send(f"Already posted: {cached.jump_url}")
+
+
+def _chunk_lines(lines: list[str], limit: int) -> list[str]:
+    """Join lines into as few messages as possible without exceeding ``limit`` characters each."""
+    chunks: list[str] = []
+    current = ""
+    for line in lines:
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > limit and current:
+            chunks.append(current)
+            candidate = line
+        current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
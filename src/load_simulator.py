@@ -0,0 +1,568 @@
+"""Gateway load simulator for MyClient.on_message.
+
+Feeds synthetic messages into ``MyClient.on_message`` at a fixed rate, the same
+way discord.py dispatches gateway events (one task per event), while every
+outbound HTTP request from the apps is routed to a local stub upstream and every
+reply lands in a stub channel. Periodically reports throughput, handler latency
+percentiles, event-loop lag, RSS, error replies per message kind and the size of
+the shared ``AppBase.candidate_urls`` list.
+
+The apps catch their own exceptions and answer with error text, so replies are
+classified by content; a message that got any error reply counts as an error.
+The run exits non-zero if every message of a link kind ended in an error, since
+that means the kind's code path (and any leak in it) was never exercised.
+
+    python src/load_simulator.py --rate 50 --duration 3600 --report-interval 60
+"""
+import argparse
+import asyncio
+import contextvars
+import itertools
+import json
+import os
+import random
+import resource
+import sys
+import time
+import tracemalloc
+import warnings
+
+import aiohttp
+import discord
+from aiohttp import web
+from yarl import URL
+
+from apps.app_base import AppBase
+from client import MyClient
+from utils.fast_runtime import install_fast_runtime
+
+DEFAULT_MIX = "chatter=70,ifunny=10,instagram=7,twitter=7,tiktok=6"
+
+CHATTER_WORDS = (
+    "lol", "lmao", "bruh", "what", "is", "this", "meme", "no", "way", "ok",
+    "did", "you", "see", "that", "gg", "brb", "anyone", "online", "tonight",
+)
+
+JPEG_MAGIC = b"\xff\xd8\xff\xe0"
+
+# Reply prefixes the apps use for failures, mapped to a short category name.
+ERROR_REPLY_PREFIXES = {
+    "Error processing": "error_processing",
+    "Failed to deliver": "failed_to_deliver",
+    "Failed to download": "failed_to_download",
+    "Could not find media": "no_media",
+    "[slop]": "too_large",
+}
+
+
+class DispatchRecord:
+    """Per-message state the stub channel fills in while the handler runs."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.error_replies: dict[str, int] = {}
+        self.cache_hit = False
+
+
+_current_dispatch: contextvars.ContextVar[DispatchRecord | None] = contextvars.ContextVar("current_dispatch", default=None)
+
+
+# Replies MyClient sends when it serves a repost from the upload cache.
+CACHE_HIT_REPLY_PREFIXES = ("Already posted:", "https://cdn.discordapp.com/attachments/")
+
+
+def _classify_reply(content: str | None) -> str | None:
+    for prefix, category in ERROR_REPLY_PREFIXES.items():
+        if content and content.startswith(prefix):
+            return category
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Stub upstreams
+# ---------------------------------------------------------------------------
+
+class StubUpstream:
+    """Local aiohttp server standing in for iFunny, Instagram, fxtwitter, tikwm and the media CDNs.
+
+    Requests arrive as ``/<original host>/<original path>`` (see ``_rewrite_session``).
+    """
+
+    def __init__(self, media_size: int, latency: float):
+        self.media_body = JPEG_MAGIC + b"\0" * max(0, media_size - len(JPEG_MAGIC))
+        self.latency = latency
+        self.requests = 0
+        self.port = None
+        self._runner = None
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        host, _, path = request.path.lstrip("/").partition("/")
+        path = "/" + path
+
+        if path.endswith((".jpg", ".mp4")):
+            content_type = "video/mp4" if path.endswith(".mp4") else "image/jpeg"
+            if request.method == "HEAD":
+                return web.Response(headers={"Content-Type": content_type})
+            return web.Response(body=self.media_body, content_type=content_type)
+
+        if host == "ifunny.co":
+            post_id = path.rstrip("/").rsplit("/", 1)[-1]
+            return self._og_page(f"https://img.ifunny.co/images/{post_id}.jpg")
+
+        if host.endswith("instagram.com"):
+            shortcode = path.strip("/").split("/")[-1]
+            return self._og_page(f"https://scontent.cdninstagram.com/v/{shortcode}.jpg")
+
+        if host == "api.fxtwitter.com":
+            tweet_id = path.rstrip("/").rsplit("/", 1)[-1]
+            return web.json_response({
+                "code": 200,
+                "tweet": {"media": {"all": [{"type": "photo", "url": f"https://pbs.twimg.com/media/{tweet_id}.jpg"}]}},
+            })
+
+        if host.endswith("tikwm.com"):
+            video_id = request.query.get("url", "").rstrip("/").rsplit("/", 1)[-1]
+            return web.json_response({
+                "code": 0,
+                "msg": "success",
+                "data": {"play": f"https://v16m.tiktokcdn.com/video/{video_id}.mp4"},
+            })
+
+        return web.Response(status=404)
+
+    def _og_page(self, media_url: str) -> web.Response:
+        html = f'<html><head><meta property="og:image" content="{media_url}"></head><body></body></html>'
+        return web.Response(text=html, content_type="text/html")
+
+
+def _rewrite_session(port: int) -> type:
+    """Build a ClientSession subclass that sends every request to the stub upstream."""
+
+    # aiohttp discourages subclassing ClientSession; it is the least invasive way
+    # to reroute the sessions the apps create without touching their code.
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+
+        class StubRoutedSession(aiohttp.ClientSession):
+            def _request(self, method, str_or_url, **kwargs):
+                url = URL(str_or_url)
+                if url.host != "127.0.0.1":
+                    url = URL.build(
+                        scheme="http",
+                        host="127.0.0.1",
+                        port=port,
+                        path=f"/{url.host}{url.path}",
+                        query=url.query,
+                    )
+                return super()._request(method, url, **kwargs)
+
+    return StubRoutedSession
+
+
+# ---------------------------------------------------------------------------
+# Stub gateway objects
+# ---------------------------------------------------------------------------
+
+class StubAttachment:
+    def __init__(self, url: str):
+        self.url = url
+
+
+class StubSentMessage:
+    def __init__(self, message_id: int, channel: "StubChannel", attachments: list[StubAttachment]):
+        self.id = message_id
+        self.channel = channel
+        self.attachments = attachments
+        self.jump_url = f"https://discord.com/channels/{channel.guild.id}/{channel.id}/{message_id}"
+
+
+class StubChannel:
+    """Accepts ``send`` calls like a TextChannel and only keeps counters."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, channel_id: int, guild: "StubGuild", stats: "Stats"):
+        self.id = channel_id
+        self.guild = guild
+        self.stats = stats
+
+    async def send(self, content: str | None = None, *, file: discord.File | None = None, **kwargs) -> StubSentMessage:
+        message_id = next(self._ids)
+        attachments = []
+        if file is not None:
+            file.fp.seek(0, os.SEEK_END)
+            self.stats.bytes_uploaded += file.fp.tell()
+            self.stats.uploads += 1
+            attachments.append(StubAttachment(
+                f"https://cdn.discordapp.com/attachments/{self.id}/{message_id}/{file.filename}"
+            ))
+            file.close()
+        else:
+            self.stats.text_replies += 1
+            category = _classify_reply(content)
+            record = _current_dispatch.get()
+            if category and record is not None:
+                record.error_replies[category] = record.error_replies.get(category, 0) + 1
+            elif content and content.startswith(CACHE_HIT_REPLY_PREFIXES) and record is not None:
+                record.cache_hit = True
+        return StubSentMessage(message_id, self, attachments)
+
+
+class StubGuild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+
+    def get_channel_or_thread(self, channel_id: int) -> None:
+        # Stub authors aren't Members, so cross-channel reuse always re-uploads.
+        return None
+
+
+class StubAuthor:
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.bot = False
+
+
+class StubMessage:
+    """The subset of ``discord.Message`` that MyClient and the apps read."""
+
+    def __init__(self, content: str, channel: StubChannel, author: StubAuthor):
+        self.content = content
+        self.channel = channel
+        self.guild = channel.guild
+        self.author = author
+
+
+class MessageFactory:
+    """Produces a weighted mix of chatter and supported links drawn from a bounded pool of posts."""
+
+    def __init__(self, mix: dict[str, float], link_pool: int, channels: list[StubChannel], seed: int):
+        self.rng = random.Random(seed)
+        self.kinds = list(mix)
+        self.weights = [mix[k] for k in self.kinds]
+        self.link_pool = link_pool
+        self.channels = channels
+        self.authors = [StubAuthor(1000 + i) for i in range(50)]
+
+    def next(self) -> tuple[str, StubMessage]:
+        kind = self.rng.choices(self.kinds, self.weights)[0]
+        post = self.rng.randrange(self.link_pool)
+        content = getattr(self, f"_{kind}")(post)
+        message = StubMessage(content, self.rng.choice(self.channels), self.rng.choice(self.authors))
+        return kind, message
+
+    def _chatter(self, post: int) -> str:
+        words = " ".join(self.rng.choices(CHATTER_WORDS, k=self.rng.randint(1, 12)))
+        if self.rng.random() < 0.1:
+            words += f" https://www.youtube.com/watch?v={post}"
+        return words
+
+    def _ifunny(self, post: int) -> str:
+        return f"Tap to see the meme - https://ifunny.co/picture/meme{post}"
+
+    def _instagram(self, post: int) -> str:
+        return f"look at this https://www.instagram.com/p/SC{post}/?igsh=abc{self.rng.randrange(1000)}"
+
+    def _twitter(self, post: int) -> str:
+        return f"https://x.com/someone/status/{post}?s=20"
+
+    def _tiktok(self, post: int) -> str:
+        return f"https://www.tiktok.com/@someone/video/{post}"
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # ru_maxrss is the peak (KiB on Linux, bytes on macOS); better than nothing.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Stats:
+    def __init__(self):
+        self.sent = 0
+        self.completed = 0
+        self.errors = 0
+        self.exceptions = 0
+        self.in_flight = 0
+        self.uploads = 0
+        self.text_replies = 0
+        self.link_messages = 0
+        self.cache_hits = 0
+        self.bytes_uploaded = 0
+        self.latencies: list[float] = []
+        self.loop_lags: list[float] = []
+        self.by_kind: dict[str, int] = {}
+        self.errors_by_kind: dict[str, int] = {}
+        self.error_replies_by_kind: dict[str, dict[str, int]] = {}
+
+    def drain_interval(self) -> tuple[list[float], list[float]]:
+        latencies, self.latencies = sorted(self.latencies), []
+        lags, self.loop_lags = sorted(self.loop_lags), []
+        return latencies, lags
+
+
+async def _monitor_loop_lag(stats: Stats, interval: float = 0.1) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        stats.loop_lags.append(max(0.0, loop.time() - start - interval))
+
+
+async def _timed_dispatch(client: MyClient, kind: str, message: StubMessage, stats: Stats) -> None:
+    record = DispatchRecord(kind)
+    _current_dispatch.set(record)
+    stats.in_flight += 1
+    start = time.perf_counter()
+    failed = False
+    try:
+        await client.on_message(message)
+    except Exception:
+        stats.exceptions += 1
+        failed = True
+    finally:
+        stats.latencies.append(time.perf_counter() - start)
+        stats.completed += 1
+        stats.in_flight -= 1
+        stats.by_kind[kind] = stats.by_kind.get(kind, 0) + 1
+
+        if kind != "chatter":
+            stats.link_messages += 1
+            stats.cache_hits += record.cache_hit
+
+        replies = stats.error_replies_by_kind.setdefault(kind, {})
+        for category, count in record.error_replies.items():
+            replies[category] = replies.get(category, 0) + count
+        if failed or record.error_replies:
+            stats.errors += 1
+            stats.errors_by_kind[kind] = stats.errors_by_kind.get(kind, 0) + 1
+
+
+def _report(client: MyClient, stats: Stats, elapsed: float, window: float, completed_before: int, rss_start: int) -> dict:
+    latencies, lags = stats.drain_interval()
+    rss = _rss_bytes()
+    return {
+        "elapsed_s": round(elapsed, 1),
+        "sent": stats.sent,
+        "completed": stats.completed,
+        "errors": stats.errors,
+        "exceptions": stats.exceptions,
+        "in_flight": stats.in_flight,
+        "msgs_per_s": round((stats.completed - completed_before) / window, 1) if window else 0.0,
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50) * 1000, 2),
+            "p95": round(_percentile(latencies, 95) * 1000, 2),
+            "p99": round(_percentile(latencies, 99) * 1000, 2),
+            "max": round((latencies[-1] if latencies else 0.0) * 1000, 2),
+        },
+        "loop_lag_ms": {
+            "p99": round(_percentile(lags, 99) * 1000, 2),
+            "max": round((lags[-1] if lags else 0.0) * 1000, 2),
+        },
+        "rss_mb": round(rss / 1024 / 1024, 1),
+        "rss_growth_mb": round((rss - rss_start) / 1024 / 1024, 1),
+        "uploads": stats.uploads,
+        "text_replies": stats.text_replies,
+        "upload_cache_entries": len(client.upload_cache),
+        # Share of link messages answered from the upload cache; near 1.0 means the
+        # download/upload path is barely being measured.
+        "cache_hit_ratio": round(stats.cache_hits / stats.link_messages, 3) if stats.link_messages else 0.0,
+        # One class-level list shared by every app, so it is reported once.
+        "candidate_urls": len(AppBase.candidate_urls),
+    }
+
+
+def _print_report(report: dict, as_json: bool) -> None:
+    if as_json:
+        print(json.dumps(report), flush=True)
+        return
+    lat = report["latency_ms"]
+    lag = report["loop_lag_ms"]
+    print(
+        f"[{report['elapsed_s']:>8}s] {report['msgs_per_s']:>7} msg/s "
+        f"lat p50={lat['p50']}ms p95={lat['p95']}ms p99={lat['p99']}ms max={lat['max']}ms | "
+        f"lag p99={lag['p99']}ms max={lag['max']}ms | "
+        f"rss={report['rss_mb']}MB (+{report['rss_growth_mb']}) | "
+        f"in_flight={report['in_flight']} errors={report['errors']} "
+        f"cache_hits={report['cache_hit_ratio']:.0%} candidate_urls={report['candidate_urls']}",
+        flush=True,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+def _fully_failed_kinds(stats: Stats) -> list[str]:
+    """Link kinds where every message ended in an error reply or exception."""
+    return [
+        kind for kind, count in stats.by_kind.items()
+        if kind != "chatter" and count and stats.errors_by_kind.get(kind, 0) == count
+    ]
+
+
+def _parse_mix(raw: str) -> dict[str, float]:
+    mix = {}
+    for part in raw.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if not hasattr(MessageFactory, f"_{kind}"):
+            raise SystemExit(f"Error: unknown message kind in --mix: {kind!r}")
+        mix[kind] = float(weight)
+    return mix
+
+
+async def run(args: argparse.Namespace) -> dict:
+    stats = Stats()
+    upstream = StubUpstream(media_size=args.media_size * 1024, latency=args.upstream_latency / 1000)
+    await upstream.start()
+
+    original_session = aiohttp.ClientSession
+    aiohttp.ClientSession = _rewrite_session(upstream.port)
+
+    intents = discord.Intents.default()
+    intents.message_content = True
+    client = MyClient(intents=intents, dedup_mode=args.dedup_mode, dedup_ttl=args.dedup_ttl)
+
+    guilds = [StubGuild(1 + i) for i in range(args.guilds)]
+    channels = [StubChannel(100 + i, guilds[i % len(guilds)], stats) for i in range(args.guilds * 3)]
+    factory = MessageFactory(_parse_mix(args.mix), args.link_pool, channels, args.seed)
+
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    lag_task = asyncio.create_task(_monitor_loop_lag(stats))
+    tasks: set[asyncio.Task] = set()
+    loop = asyncio.get_running_loop()
+    rss_start = _rss_bytes()
+    start = loop.time()
+    next_report = start + args.report_interval
+    last_report_at, completed_before = start, 0
+    final = {}
+
+    try:
+        for i in itertools.count():
+            now = loop.time()
+            if now - start >= args.duration:
+                break
+
+            if now >= next_report:
+                final = _report(client, stats, now - start, now - last_report_at, completed_before, rss_start)
+                _print_report(final, args.json)
+                last_report_at, completed_before = now, stats.completed
+                next_report += args.report_interval
+
+            target = start + i / args.rate
+            if target > now:
+                await asyncio.sleep(target - now)
+
+            kind, message = factory.next()
+            stats.sent += 1
+            task = asyncio.create_task(_timed_dispatch(client, kind, message, stats))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.wait(tasks, timeout=args.drain_timeout)
+        now = loop.time()
+        final = _report(client, stats, now - start, now - last_report_at, completed_before, rss_start)
+        final["overall_msgs_per_s"] = round(stats.completed / (now - start), 1)
+        final["by_kind"] = stats.by_kind
+        final["errors_by_kind"] = stats.errors_by_kind
+        final["error_replies_by_kind"] = {kind: replies for kind, replies in stats.error_replies_by_kind.items() if replies}
+        final["fully_failed_kinds"] = _fully_failed_kinds(stats)
+        final["upstream_requests"] = upstream.requests
+        final["mb_uploaded"] = round(stats.bytes_uploaded / 1024 / 1024, 1)
+        print("--- summary ---", flush=True)
+        print(json.dumps(final, indent=None if args.json else 2), flush=True)
+
+        if args.tracemalloc:
+            print("--- top allocations ---", flush=True)
+            for stat in tracemalloc.take_snapshot().statistics("lineno")[:10]:
+                print(stat, flush=True)
+
+        for kind in final["fully_failed_kinds"]:
+            print(
+                f"WARNING: every {kind} message ended in an error reply; its code path was not exercised.",
+                file=sys.stderr,
+                flush=True,
+            )
+    finally:
+        lag_task.cancel()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        aiohttp.ClientSession = original_session
+        await upstream.stop()
+
+    return final
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feed synthetic gateway messages into MyClient.on_message against stub upstreams")
+    parser.add_argument("--rate", type=float, default=20, help="Messages per second to dispatch")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds to run (use hours for soak tests)")
+    parser.add_argument("--report-interval", type=float, default=10, help="Seconds between progress reports")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Weighted message mix (default: {DEFAULT_MIX})")
+    parser.add_argument("--link-pool", type=int, default=500, help="Distinct posts per platform; smaller means more repeats")
+    parser.add_argument("--guilds", type=int, default=5, help="Number of stub guilds (3 channels each)")
+    parser.add_argument("--media-size", type=int, default=256, help="Stub media size in KiB")
+    parser.add_argument("--upstream-latency", type=float, default=20, help="Stub upstream latency in ms")
+    parser.add_argument(
+        "--dedup-mode",
+        default="off",
+        choices=("off", "jump", "resend"),
+        help="MyClient dedup mode; off keeps every link on the download/upload path (production defaults to jump)",
+    )
+    parser.add_argument("--dedup-ttl", type=float, default=3600, help="MyClient dedup TTL in seconds")
+    parser.add_argument("--drain-timeout", type=float, default=30, help="Seconds to wait for in-flight handlers at the end")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the message mix")
+    parser.add_argument("--fast", action="store_true", help="Install the uvloop/orjson fast runtime first")
+    parser.add_argument("--tracemalloc", action="store_true", help="Print the top allocation sites at the end")
+    parser.add_argument("--json", action="store_true", help="Emit reports as JSON lines")
+    args = parser.parse_args()
+
+    if args.rate <= 0:
+        raise SystemExit("Error: --rate must be positive.")
+
+    if args.fast:
+        install_fast_runtime()
+
+    final = asyncio.run(run(args))
+    if final.get("fully_failed_kinds"):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
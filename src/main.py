@@ -3,7 +3,8 @@ import asyncio
 import os
 import sys
 import discord
-from client import MyClient
+from client import DEDUP_MODES, MyClient
+from utils.fast_runtime import benchmark_runtime, install_fast_runtime
 
 async def _run_cli(client: MyClient, url: str) -> None:
     for app in client.apps:
@@ -17,17 +18,52 @@ async def _run_cli(client: MyClient, url: str) -> None:
 def main():
     parser = argparse.ArgumentParser(description="Ifunny/Instagram resolver bot/cli entry point")
     parser.add_argument("--url", help="Resolve a single supported link locally")
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        default=os.getenv("FAST_RUNTIME", "").lower() in ("1", "true", "yes"),
+        help="Use uvloop and orjson when installed (or set FAST_RUNTIME=1)",
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        default=os.getenv("DEBUG", "").lower() in ("1", "true", "yes"),
+        help="Print runtime benchmark numbers at startup (or set DEBUG=1)",
+    )
     args = parser.parse_args()
 
+    if args.debug:
+        for mode, timings in benchmark_runtime().items():
+            numbers = ", ".join(f"{name}={value:.2f}" for name, value in timings.items())
+            print(f"[debug] {mode} runtime: {numbers}")
+
+    if args.fast:
+        enabled = install_fast_runtime()
+        print(f"Fast runtime: uvloop={'on' if enabled['uvloop'] else 'unavailable'}, "
+              f"orjson={'on' if enabled['orjson'] else 'unavailable'}")
+
     token = os.getenv("TOKEN")
     if not token:
         print("TOKEN environment variable not set.", file=sys.stderr)
         raise SystemExit(1)
 
+    dedup_mode = os.getenv("DEDUP_MODE", "jump").lower()
+    if dedup_mode not in DEDUP_MODES:
+        print(f"DEDUP_MODE must be one of: {', '.join(DEDUP_MODES)}.", file=sys.stderr)
+        raise SystemExit(1)
+
+    try:
+        dedup_ttl = float(os.getenv("DEDUP_TTL", "3600"))
+    except ValueError:
+        dedup_ttl = -1
+    if dedup_ttl <= 0:
+        print("DEDUP_TTL must be a positive number of seconds.", file=sys.stderr)
+        raise SystemExit(1)
+
     intents = discord.Intents.default()
     intents.message_content = True
 
-    client = MyClient(intents=intents)
+    client = MyClient(intents=intents, dedup_mode=dedup_mode, dedup_ttl=dedup_ttl)
     client.run(token)
 
     if args.url:
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from typing import Any
+
+try:
+	import orjson
+except ImportError:  # optional dependency
+	orjson = None
+
+try:
+	import uvloop
+except ImportError:  # optional dependency
+	uvloop = None
+
+
+_fast_json_enabled = False
+
+# Shaped like the GraphQL/fxtwitter/tikwm payloads the apps decode.
+_BENCH_PAYLOAD = {
+	"data": {
+		"xdt_shortcode_media": {
+			"__typename": "XDTGraphSidecar",
+			"is_video": False,
+			"display_url": "https://scontent.cdninstagram.com/v/t51.2885-15/example.jpg",
+			"edge_sidecar_to_children": {
+				"edges": [
+					{
+						"node": {
+							"is_video": i % 2 == 0,
+							"video_url": f"https://scontent.cdninstagram.com/v/t50.2886-16/{i}.mp4",
+							"display_url": f"https://scontent.cdninstagram.com/v/t51.2885-15/{i}.jpg",
+							"video_resources": [{"src": f"https://cdn.example/{i}_{w}.mp4", "width": w} for w in (480, 720, 1080)],
+						}
+					}
+					for i in range(10)
+				]
+			},
+		}
+	}
+}
+
+
+def json_loads(data: str | bytes) -> Any:
+	"""Decode JSON with orjson when the fast runtime is enabled, else the stdlib."""
+	if _fast_json_enabled:
+		return orjson.loads(data)
+	return json.loads(data)
+
+
+def json_dumps(obj: Any) -> str:
+	"""Encode compact JSON with orjson when the fast runtime is enabled, else the stdlib."""
+	if _fast_json_enabled:
+		return orjson.dumps(obj).decode()
+	return json.dumps(obj, separators=(",", ":"))
+
+
+def install_fast_runtime() -> dict[str, bool]:
+	"""Install uvloop and switch to orjson where available.
+
+	Must run before the event loop is created (i.e. before ``client.run``).
+	Returns which components were actually enabled.
+	"""
+	global _fast_json_enabled
+
+	if uvloop is not None:
+		asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+	_fast_json_enabled = orjson is not None
+
+	return {"uvloop": uvloop is not None, "orjson": _fast_json_enabled}
+
+
+def _time_per_op(func, iterations: int) -> float:
+	start = time.perf_counter()
+	for _ in range(iterations):
+		func()
+	return (time.perf_counter() - start) / iterations * 1e6
+
+
+def _time_loop(loop: asyncio.AbstractEventLoop, iterations: int) -> float:
+	async def _spin():
+		for _ in range(iterations):
+			await asyncio.sleep(0)
+
+	try:
+		start = time.perf_counter()
+		loop.run_until_complete(_spin())
+		return (time.perf_counter() - start) / iterations * 1e6
+	finally:
+		loop.close()
+
+
+def benchmark_runtime(iterations: int = 2000) -> dict[str, dict[str, float]]:
+	"""Micro-benchmark the stdlib and fast runtimes, in microseconds per op.
+
+	Modes whose optional dependency is not installed are omitted.
+	"""
+	encoded = json.dumps(_BENCH_PAYLOAD, separators=(",", ":"))
+
+	results: dict[str, dict[str, float]] = {
+		"stdlib": {
+			"json_loads_us": _time_per_op(lambda: json.loads(encoded), iterations),
+			"json_dumps_us": _time_per_op(lambda: json.dumps(_BENCH_PAYLOAD, separators=(",", ":")), iterations),
+			"loop_tick_us": _time_loop(asyncio.DefaultEventLoopPolicy().new_event_loop(), iterations),
+		}
+	}
+
+	fast: dict[str, float] = {}
+	if orjson is not None:
+		fast["json_loads_us"] = _time_per_op(lambda: orjson.loads(encoded), iterations)
+		fast["json_dumps_us"] = _time_per_op(lambda: orjson.dumps(_BENCH_PAYLOAD), iterations)
+	if uvloop is not None:
+		fast["loop_tick_us"] = _time_loop(uvloop.new_event_loop(), iterations)
+	if fast:
+		results["fast"] = fast
+
+	return results
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from urllib.parse import parse_qs, urlsplit
+
+import discord
+
+
+@dataclass
+class UploadEntry:
+	channel_id: int
+	message_ids: list[int]
+	jump_url: str
+	attachment_urls: list[str] = field(default_factory=list)
+	expires_at: float = 0.0
+
+
+def _cdn_expiry(url: str) -> float | None:
+	"""Return the expiry encoded in a signed Discord CDN URL (``ex`` is a hex timestamp)."""
+	values = parse_qs(urlsplit(url).query).get("ex")
+	if not values:
+		return None
+	try:
+		return float(int(values[0], 16))
+	except ValueError:
+		return None
+
+
+class UploadCache:
+	"""Remembers, per guild and canonical link, the bot message that already carries its media.
+
+	Entries expire after ``ttl`` seconds (or earlier if Discord's signed attachment
+	URLs expire first) and the cache is bounded to ``max_entries`` using LRU eviction.
+	Links whose upload failed are remembered for ``failure_ttl`` seconds so reposts
+	don't retry the same failing download.
+	"""
+
+	def __init__(self, ttl: float = 3600, max_entries: int = 1024, failure_ttl: float = 60):
+		self.ttl = ttl
+		self.max_entries = max_entries
+		self.failure_ttl = failure_ttl
+		self._entries: OrderedDict[tuple[int, str], UploadEntry] = OrderedDict()
+		self._keys_by_message: dict[int, tuple[int, str]] = {}
+		self._failures: dict[tuple[int, str], float] = {}
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	def get(self, guild_id: int, link: str) -> UploadEntry | None:
+		key = (guild_id, link)
+		entry = self._entries.get(key)
+		if entry is None:
+			return None
+		if entry.expires_at <= time.time():
+			self._remove(key)
+			return None
+		self._entries.move_to_end(key)
+		return entry
+
+	def store(self, guild_id: int, link: str, messages: list[discord.Message]) -> None:
+		if not messages:
+			return
+
+		attachment_urls = [a.url for m in messages for a in m.attachments]
+		expires_at = time.time() + self.ttl
+		for url in attachment_urls:
+			cdn_expiry = _cdn_expiry(url)
+			if cdn_expiry is not None:
+				expires_at = min(expires_at, cdn_expiry)
+
+		key = (guild_id, link)
+		self._remove(key)
+		message_ids = [m.id for m in messages]
+		self._failures.pop(key, None)
+		self._entries[key] = UploadEntry(
+			channel_id=messages[0].channel.id,
+			message_ids=message_ids,
+			jump_url=messages[0].jump_url,
+			attachment_urls=attachment_urls,
+			expires_at=expires_at,
+		)
+		for message_id in message_ids:
+			self._keys_by_message[message_id] = key
+
+		while len(self._entries) > self.max_entries:
+			oldest = next(iter(self._entries))
+			self._remove(oldest)
+
+	def mark_failed(self, guild_id: int, link: str) -> None:
+		now = time.time()
+		if len(self._failures) >= self.max_entries:
+			self._failures = {k: exp for k, exp in self._failures.items() if exp > now}
+			while len(self._failures) >= self.max_entries:
+				del self._failures[next(iter(self._failures))]
+		self._failures[(guild_id, link)] = now + self.failure_ttl
+
+	def failed_recently(self, guild_id: int, link: str) -> bool:
+		key = (guild_id, link)
+		expires_at = self._failures.get(key)
+		if expires_at is None:
+			return False
+		if expires_at <= time.time():
+			del self._failures[key]
+			return False
+		return True
+
+	def forget_messages(self, message_ids) -> None:
+		"""Drop every entry that includes a message that no longer exists."""
+		for message_id in message_ids:
+			key = self._keys_by_message.get(message_id)
+			if key is not None:
+				self._remove(key)
+
+	def _remove(self, key: tuple[int, str]) -> None:
+		entry = self._entries.pop(key, None)
+		if entry is not None:
+			for message_id in entry.message_ids:
+				self._keys_by_message.pop(message_id, None)